@@ -1,58 +1,104 @@
 """Utilities for launching kernels"""
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
+import asyncio
+import functools
 import os
+import shutil
 import sys
+import threading
 from subprocess import PIPE
 from subprocess import Popen
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import TextIO
+from typing import Tuple
 
 from traitlets.log import get_logger
 
+# These cannot change for the lifetime of the process, so resolve them once.
+# Code using the Windows-only names imported below must still test
+# sys.platform itself, which is the only form type checkers understand.
+_IS_WIN32 = sys.platform == "win32"
+# If this process in running on pythonw, we know that stdin, stdout, and
+# stderr are all invalid.
+_REDIRECT_OUT = sys.executable.endswith("pythonw.exe")
 
-def launch_kernel(
-    cmd: List[str],
-    stdin: Optional[int] = None,
-    stdout: Optional[int] = None,
-    stderr: Optional[int] = None,
-    env: Optional[Dict[str, str]] = None,
-    independent: bool = False,
-    cwd: Optional[str] = None,
-    **kw: Any,
-) -> Popen:
-    """Launches a localhost kernel, binding to the specified ports.
+# Shared sink for the standard streams of kernels launched from pythonw.
+# Popen duplicates the descriptor into each child, so one handle is enough.
+_BLACKHOLE: Optional[TextIO] = None
 
-    Parameters
-    ----------
-    cmd : Popen list,
-        A string of Python code that imports and executes a kernel entry point.
+# Inheritable handle on this process, passed to non-independent kernels on
+# Windows as JPY_PARENT_PID. It stays valid for the lifetime of this process.
+_PARENT_HANDLE_STR: Optional[str] = None
+# Kernels may be launched from worker threads, so the handle is created under
+# a lock to make sure only one is ever duplicated.
+_PARENT_HANDLE_LOCK = threading.Lock()
 
-    stdin, stdout, stderr : optional (default None)
-        Standards streams, as defined in subprocess.Popen.
+# Serializes kernel spawns on Windows. Kernels are launched with close_fds=False
+# there, so a child created while another thread is spawning would inherit that
+# sibling's inheritable pipe ends (bpo-19575) and keep them open.
+_SPAWN_LOCK = threading.Lock()
 
-    env: dict, optional
-        Environment variables passed to the kernel
+# Absolute paths of kernel executables, keyed by (name, PATH) so a different
+# search path in the kernel environment gets its own lookup.
+_which_cache: Dict[Tuple[str, str], str] = {}
 
-    independent : bool, optional (default False)
-        If set, the kernel process is guaranteed to survive if this process
-        dies. If not set, an effort is made to ensure that the kernel is killed
-        when this process dies. Note that in this case it is still good practice
-        to kill kernels manually before exiting.
+if sys.platform == "win32":
+    try:
+        from _winapi import (
+            CREATE_NEW_PROCESS_GROUP,
+            DUPLICATE_SAME_ACCESS,
+            DuplicateHandle,
+            GetCurrentProcess,
+        )
+    except:  # noqa
+        from _subprocess import (
+            GetCurrentProcess,
+            CREATE_NEW_PROCESS_GROUP,
+            DUPLICATE_SAME_ACCESS,
+            DuplicateHandle,
+        )
 
-    cwd : path, optional
-        The working dir of the kernel process (default: cwd of this process).
+    def _get_parent_handle_str() -> str:
+        """Return the inheritable handle on this process, duplicating it on first use."""
+        global _PARENT_HANDLE_STR
+        if _PARENT_HANDLE_STR is None:
+            with _PARENT_HANDLE_LOCK:
+                if _PARENT_HANDLE_STR is None:
+                    pid = GetCurrentProcess()
+                    handle = DuplicateHandle(
+                        pid,
+                        pid,
+                        pid,
+                        0,
+                        True,
+                        DUPLICATE_SAME_ACCESS,  # Inheritable by new processes.
+                    )
+                    _PARENT_HANDLE_STR = str(int(handle))
+        return _PARENT_HANDLE_STR
 
-    **kw: optional
-        Additional arguments for Popen
 
-    Returns
-    -------
+def _get_blackhole() -> TextIO:
+    """Return the shared handle on os.devnull, opening it on first use."""
+    global _BLACKHOLE
+    if _BLACKHOLE is None:
+        _BLACKHOLE = open(os.devnull, "w")
+    return _BLACKHOLE
 
-    Popen instance for the kernel subprocess
-    """
+
+def _popen_kwargs(
+    stdin: Optional[int],
+    stdout: Optional[int],
+    stderr: Optional[int],
+    cwd: Optional[str],
+    env: Mapping[str, str],
+    kw: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Build the Popen keyword arguments shared by all platforms."""
 
     # Popen will fail (sometimes with a deadlock) if stdin, stdout, and stderr
     # are invalid. Unfortunately, there is in general no way to detect whether
@@ -62,33 +108,77 @@ def launch_kernel(
     # If this process has been backgrounded, our stdin is invalid. Since there
     # is no compelling reason for the kernel to inherit our stdin anyway, we'll
     # place this one safe and always redirect.
-    redirect_in = True
     _stdin = PIPE if stdin is None else stdin
 
-    # If this process in running on pythonw, we know that stdin, stdout, and
-    # stderr are all invalid.
-    redirect_out = sys.executable.endswith("pythonw.exe")
-    if redirect_out:
-        blackhole = open(os.devnull, "w")
+    if _REDIRECT_OUT:
+        blackhole = _get_blackhole()
         _stdout = blackhole if stdout is None else stdout
         _stderr = blackhole if stderr is None else stderr
     else:
         _stdout, _stderr = stdout, stderr
 
-    env = env if (env is not None) else os.environ.copy()
-
-    kwargs = kw.copy()
-    main_args = dict(
+    kwargs: Dict[str, Any] = dict(
         stdin=_stdin,
         stdout=_stdout,
         stderr=_stderr,
         cwd=cwd,
         env=env,
     )
-    kwargs.update(main_args)
+    if kw:
+        # Extra Popen arguments never override the ones above.
+        kwargs = {**kw, **kwargs}
+    return kwargs
+
 
-    # Spawn a kernel.
+def _prepare_posix_args(
+    stdin: Optional[int],
+    stdout: Optional[int],
+    stderr: Optional[int],
+    env: Optional[Mapping[str, str]],
+    independent: bool,
+    cwd: Optional[str],
+    kw: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Build the Popen keyword arguments for a kernel launch on POSIX.
+
+    None of the Windows handling applies, so this path stays short.
+    """
+    if env is None:
+        env = os.environ
+    if not independent:
+        # Only this variable is added, so the inherited environment is copied
+        # here instead of up front.
+        env = {**env, "JPY_PARENT_PID": str(os.getpid())}
+
+    kwargs = _popen_kwargs(stdin, stdout, stderr, cwd, env, kw)
+
+    # Create a new session.
+    # This makes it easier to interrupt the kernel,
+    # because we want to interrupt the whole process group.
+    # We don't use setpgrp, which is known to cause problems for kernels starting
+    # certain interactive subprocesses, such as bash -i.
+    kwargs["start_new_session"] = True
+    return kwargs
+
+
+def _prepare_process_args(
+    stdin: Optional[int] = None,
+    stdout: Optional[int] = None,
+    stderr: Optional[int] = None,
+    env: Optional[Mapping[str, str]] = None,
+    independent: bool = False,
+    cwd: Optional[str] = None,
+    kw: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Optional[int]]:
+    """Build the Popen keyword arguments for a kernel launch.
+
+    Returns the kwargs and, on Windows, the interrupt event for the kernel.
+    """
     if sys.platform == "win32":
+        if env is None:
+            env = os.environ
+        kwargs = _popen_kwargs(stdin, stdout, stderr, cwd, env, kw)
+
         if cwd:
             kwargs["cwd"] = cwd
 
@@ -97,42 +187,18 @@ def launch_kernel(
         # Create a Win32 event for interrupting the kernel
         # and store it in an environment variable.
         interrupt_event = create_interrupt_event()
-        env["JPY_INTERRUPT_EVENT"] = str(interrupt_event)
+        extra_env: Dict[str, str] = {"JPY_INTERRUPT_EVENT": str(interrupt_event)}
         # deprecated old env name:
-        env["IPY_INTERRUPT_EVENT"] = env["JPY_INTERRUPT_EVENT"]
-
-        try:
-            from _winapi import (
-                CREATE_NEW_PROCESS_GROUP,
-                DUPLICATE_SAME_ACCESS,
-                DuplicateHandle,
-                GetCurrentProcess,
-            )
-        except:  # noqa
-            from _subprocess import (
-                GetCurrentProcess,
-                CREATE_NEW_PROCESS_GROUP,
-                DUPLICATE_SAME_ACCESS,
-                DuplicateHandle,
-            )
+        extra_env["IPY_INTERRUPT_EVENT"] = extra_env["JPY_INTERRUPT_EVENT"]
 
         # create a handle on the parent to be inherited
         if independent:
             kwargs["creationflags"] = CREATE_NEW_PROCESS_GROUP
         else:
-            pid = GetCurrentProcess()
-            handle = DuplicateHandle(
-                pid,
-                pid,
-                pid,
-                0,
-                True,
-                DUPLICATE_SAME_ACCESS,  # Inheritable by new processes.
-            )
-            env["JPY_PARENT_PID"] = str(int(handle))
+            extra_env["JPY_PARENT_PID"] = _get_parent_handle_str()
 
         # Prevent creating new console window on pythonw
-        if redirect_out:
+        if _REDIRECT_OUT:
             kwargs["creationflags"] = (
                 kwargs.setdefault("creationflags", 0) | 0x08000000
             )  # CREATE_NO_WINDOW
@@ -142,46 +208,280 @@ def launch_kernel(
         # or when no stream is captured on Python <3.7
         # (we always capture stdin, so this is already False by default on <3.7)
         kwargs["close_fds"] = False
-    else:
-        # Create a new session.
-        # This makes it easier to interrupt the kernel,
-        # because we want to interrupt the whole process group.
-        # We don't use setpgrp, which is known to cause problems for kernels starting
-        # certain interactive subprocesses, such as bash -i.
-        kwargs["start_new_session"] = True
-        if not independent:
-            env["JPY_PARENT_PID"] = str(os.getpid())
 
+        # Only the handful of variables added above are copied into a new mapping,
+        # rather than duplicating the whole inherited environment on every launch.
+        kwargs["env"] = {**env, **extra_env}
+
+        return kwargs, interrupt_event
+
+    return _prepare_posix_args(stdin, stdout, stderr, env, independent, cwd, kw), None
+
+
+def _expand_cmd(cmd: List[str]) -> List[str]:
+    """Allow to use ~/ in the command or its arguments."""
+    return [os.path.expanduser(s) if s.startswith("~") else s for s in cmd]
+
+
+def _resolve_executable(name: str, env: Mapping[str, str]) -> Optional[str]:
+    """Return the cached absolute path of a bare executable name, if it can be resolved.
+
+    This spares Popen from searching PATH on every launch. The lookup uses the
+    PATH the kernel will see. Executables installed earlier on that PATH after
+    the first lookup are not picked up until a launch fails, which clears the cache.
+    """
+    if _IS_WIN32 or os.path.sep in name:
+        return None
+    path = env.get("PATH", os.defpath)
+    key = (name, path)
+    resolved = _which_cache.get(key)
+    if resolved is None:
+        # exec searches relative (and empty) PATH entries from the kernel's
+        # working directory, which shutil.which cannot reproduce.
+        if not all(os.path.isabs(entry) for entry in path.split(os.pathsep)):
+            return None
+        resolved = shutil.which(name, path=path)
+        if resolved is None:
+            # Let Popen report the missing executable.
+            return None
+        _which_cache[key] = resolved
+    return resolved
+
+
+def _prepare_command(cmd: List[str], kwargs: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any]]:
+    """Resolve a kernel command and the Popen kwargs it is launched with."""
+    cmd = _expand_cmd(cmd)
+    # With shell=True, executable= would replace the shell itself.
+    if cmd and "executable" not in kwargs and not kwargs.get("shell"):
+        executable = _resolve_executable(cmd[0], kwargs["env"])
+        if executable is not None:
+            # Popen runs the resolved file, while the kernel still sees
+            # cmd[0] unchanged as its argv[0].
+            kwargs = {**kwargs, "executable": executable}
+    return cmd, kwargs
+
+
+def _prepare_launch(
+    cmd: List[str],
+    stdin: Optional[int] = None,
+    stdout: Optional[int] = None,
+    stderr: Optional[int] = None,
+    env: Optional[Mapping[str, str]] = None,
+    independent: bool = False,
+    cwd: Optional[str] = None,
+    kw: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], Dict[str, Any], Optional[int]]:
+    """Resolve the command and Popen kwargs for a kernel launch."""
+    kwargs, interrupt_event = _prepare_process_args(
+        stdin, stdout, stderr, env, independent, cwd, kw
+    )
+    cmd, kwargs = _prepare_command(cmd, kwargs)
+    return cmd, kwargs, interrupt_event
+
+
+class _KwargsWithoutEnv:
+    """Lazily render Popen kwargs for logging, leaving out the environment."""
+
+    def __init__(self, kwargs: Dict[str, Any]):
+        self.kwargs = kwargs
+
+    def __repr__(self) -> str:
+        # exclude environment variables,
+        # which may contain access tokens and the like.
+        return repr({key: value for key, value in self.kwargs.items() if key != "env"})
+
+
+def _handle_subprocess_exception(ex: Exception, cmd: List[str], kwargs: Dict[str, Any]) -> None:
+    """Log a failed kernel launch without leaking its environment."""
+    try:
+        env = kwargs.get("env")
+        # Formatting is deferred to the logging machinery,
+        # so nothing is rendered unless a handler emits the record.
+        # Errors raised while rendering it are reported by the handler
+        # (logging.Handler.handleError) and never reach the except below,
+        # which only covers resolving the logger and the PATH lookup.
+        get_logger().error(
+            "Failed to run command:\n%s\n    PATH=%r\n    with kwargs:\n%r\n",
+            cmd,
+            env.get("PATH", os.defpath) if env else os.defpath,
+            _KwargsWithoutEnv(kwargs),
+        )
+    except Exception as ex2:  # Don't let a formatting/logger issue lead to the wrong exception
+        print(f"Failed to run command: '{cmd}' due to exception: {ex}")
+        print(f"The following exception occurred handling the previous failure: {ex2}")
+
+
+def _do_launch(cmd: List[str], kwargs: Dict[str, Any]) -> Popen:
+    """Spawn the kernel process, logging the launch parameters on failure."""
     try:
-        # Allow to use ~/ in the command or its arguments
-        cmd = [os.path.expanduser(s) for s in cmd]
-        proc = Popen(cmd, **kwargs)
+        if _IS_WIN32:
+            with _SPAWN_LOCK:
+                return Popen(cmd, **kwargs)
+        return Popen(cmd, **kwargs)
     except Exception as ex:
-        try:
-            msg = "Failed to run command:\n{}\n    PATH={!r}\n    with kwargs:\n{!r}\n"
-            # exclude environment variables,
-            # which may contain access tokens and the like.
-            without_env = {key: value for key, value in kwargs.items() if key != "env"}
-            msg = msg.format(cmd, env.get("PATH", os.defpath), without_env)
-            get_logger().error(msg)
-        except Exception as ex2:  # Don't let a formatting/logger issue lead to the wrong exception
-            print(f"Failed to run command: '{cmd}' due to exception: {ex}")
-            print(f"The following exception occurred handling the previous failure: {ex2}")
+        # The executable may have moved since it was resolved.
+        _which_cache.clear()
+        _handle_subprocess_exception(ex, cmd, kwargs)
         raise ex
 
+
+def _finish_process_launch(
+    proc: Popen, stdin: Optional[int], interrupt_event: Optional[int]
+) -> Popen:
+    """Post-launch bookkeeping shared by all launch paths."""
     if sys.platform == "win32":
         # Attach the interrupt event to the Popen objet so it can be used later.
         proc.win32_interrupt_event = interrupt_event
 
     # Clean up pipes created to work around Popen bug.
-    if redirect_in:
-        if stdin is None:
-            assert proc.stdin is not None
-            proc.stdin.close()
+    if stdin is None:
+        assert proc.stdin is not None
+        # Nothing is ever written to this pipe, so strip the buffering layers
+        # and close the raw file directly instead of flushing on the way down.
+        stream: Any = proc.stdin
+        while hasattr(stream, "detach"):
+            stream = stream.detach()
+        stream.close()
+        proc.stdin = None
 
     return proc
 
 
+def launch_kernel(
+    cmd: List[str],
+    stdin: Optional[int] = None,
+    stdout: Optional[int] = None,
+    stderr: Optional[int] = None,
+    env: Optional[Mapping[str, str]] = None,
+    independent: bool = False,
+    cwd: Optional[str] = None,
+    **kw: Any,
+) -> Popen:
+    """Launches a localhost kernel, binding to the specified ports.
+
+    Parameters
+    ----------
+    cmd : Popen list,
+        A string of Python code that imports and executes a kernel entry point.
+
+    stdin, stdout, stderr : optional (default None)
+        Standards streams, as defined in subprocess.Popen.
+
+    env: dict, optional
+        Environment variables passed to the kernel
+
+    independent : bool, optional (default False)
+        If set, the kernel process is guaranteed to survive if this process
+        dies. If not set, an effort is made to ensure that the kernel is killed
+        when this process dies. Note that in this case it is still good practice
+        to kill kernels manually before exiting.
+
+    cwd : path, optional
+        The working dir of the kernel process (default: cwd of this process).
+
+    **kw: optional
+        Additional arguments for Popen
+
+    Returns
+    -------
+
+    Popen instance for the kernel subprocess
+    """
+    cmd, kwargs, interrupt_event = _prepare_launch(
+        cmd, stdin, stdout, stderr, env, independent, cwd, kw
+    )
+    proc = _do_launch(cmd, kwargs)
+    return _finish_process_launch(proc, stdin, interrupt_event)
+
+
+async def async_launch_kernels(
+    cmds: List[List[str]],
+    stdin: Optional[int] = None,
+    stdout: Optional[int] = None,
+    stderr: Optional[int] = None,
+    env: Optional[Mapping[str, str]] = None,
+    independent: bool = False,
+    cwd: Optional[str] = None,
+    max_concurrency: int = 8,
+    **kw: Any,
+) -> List[Popen]:
+    """Launches several localhost kernels concurrently.
+
+    Each kernel is spawned from a worker thread, so the event loop stays
+    responsive while processes are created. On Windows the processes are still
+    created one at a time, so that kernels do not inherit each other's pipes.
+
+    Parameters
+    ----------
+    cmds : list of Popen lists
+        One command per kernel, as accepted by :func:`launch_kernel`.
+
+    stdin, stdout, stderr, env, independent, cwd, **kw :
+        Shared by all kernels, see :func:`launch_kernel`.
+
+    max_concurrency : int, optional (default 8)
+        The maximum number of kernels being spawned at the same time.
+        Must be at least 1.
+
+    Returns
+    -------
+
+    list of Popen instances, in the same order as `cmds`. If any launch fails,
+    or the coroutine is cancelled, the kernels that did start are killed
+    and the exception is re-raised.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, not {max_concurrency}")
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Off Windows nothing in the Popen kwargs is specific to a single kernel,
+    # so they are built once for the whole batch.
+    shared_args = None
+    if not _IS_WIN32:
+        shared_args = _prepare_process_args(stdin, stdout, stderr, env, independent, cwd, kw)
+
+    async def launch(cmd: List[str]) -> Popen:
+        async with semaphore:
+            if shared_args is None:
+                # Windows kernels each need their own interrupt event.
+                kwargs, interrupt_event = _prepare_process_args(
+                    stdin, stdout, stderr, env, independent, cwd, kw
+                )
+            else:
+                kwargs, interrupt_event = shared_args
+            cmd, kwargs = _prepare_command(cmd, kwargs)
+            spawn = loop.run_in_executor(None, functools.partial(_do_launch, cmd, kwargs))
+            spawns.append(spawn)
+            # Cancelling cannot interrupt a Popen call already running in the
+            # worker thread, so the spawn is shielded and cleaned up below.
+            proc = await asyncio.shield(spawn)
+            return _finish_process_launch(proc, stdin, interrupt_event)
+
+    spawns: List["asyncio.Future[Popen]"] = []
+    tasks = [asyncio.ensure_future(launch(cmd)) for cmd in cmds]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        # Stop launches that have not spawned yet, wait for the ones that are
+        # spawning, then kill every kernel that did start.
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks)
+        if spawns:
+            await asyncio.wait(spawns)
+        for spawn in spawns:
+            if not spawn.cancelled() and spawn.exception() is None:
+                proc = spawn.result()
+                proc.kill()
+                # Exiting the context closes any pipes left open and reaps the kernel.
+                with proc:
+                    pass
+        raise
+
+
 __all__ = [
     "launch_kernel",
+    "async_launch_kernels",
 ]
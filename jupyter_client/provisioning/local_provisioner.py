@@ -2,6 +2,7 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 import asyncio
+import functools
 import os
 import signal
 import sys
@@ -201,7 +202,15 @@ class LocalProvisioner(KernelProvisionerBase):
 
     async def launch_kernel(self, cmd: List[str], **kwargs: Any) -> KernelConnectionInfo:
         scrubbed_kwargs = LocalProvisioner._scrub_kwargs(kwargs)
-        self.process = launch_kernel(cmd, **scrubbed_kwargs)
+        if sys.platform == 'win32':
+            # Spawning a process is slow on Windows, so keep the event loop
+            # responsive by launching from a worker thread.
+            loop = asyncio.get_running_loop()
+            self.process = await loop.run_in_executor(
+                None, functools.partial(launch_kernel, cmd, **scrubbed_kwargs)
+            )
+        else:
+            self.process = launch_kernel(cmd, **scrubbed_kwargs)
         pgid = None
         if hasattr(os, "getpgid"):
             try:
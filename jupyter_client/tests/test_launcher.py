@@ -0,0 +1,149 @@
+"""Test kernel launching"""
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from subprocess import PIPE
+
+import pytest
+
+from .. import launcher
+from ..launcher import async_launch_kernels
+from ..launcher import launch_kernel
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+
+
+async def test_async_launch_kernels():
+    cmds = [
+        [sys.executable, "-c", f"import os; print({i}, os.environ['JPY_PARENT_PID'])"]
+        for i in range(3)
+    ]
+    procs = await async_launch_kernels(cmds, stdout=PIPE, max_concurrency=2)
+    assert len(procs) == 3
+    for i, proc in enumerate(procs):
+        out, _ = proc.communicate()
+        assert proc.returncode == 0
+        assert out.split() == [str(i).encode(), str(os.getpid()).encode()]
+
+
+async def test_async_launch_kernels_failure(monkeypatch):
+    started = []
+    original_do_launch = launcher._do_launch
+
+    def do_launch(cmd, kwargs):
+        proc = original_do_launch(cmd, kwargs)
+        started.append(proc)
+        return proc
+
+    monkeypatch.setattr(launcher, "_do_launch", do_launch)
+    cmds = [
+        [sys.executable, "-c", "import time; time.sleep(60)"],
+        [os.path.join(os.path.dirname(__file__), "no-such-executable")],
+    ]
+    with pytest.raises(FileNotFoundError):
+        await async_launch_kernels(cmds)
+    # The kernel that did start is killed rather than left running.
+    assert len(started) == 1
+    assert started[0].returncode == -signal.SIGKILL
+
+
+async def test_async_launch_kernels_cancelled(monkeypatch):
+    started = []
+    spawning = threading.Event()
+    original_do_launch = launcher._do_launch
+
+    def do_launch(cmd, kwargs):
+        spawning.set()
+        # Still spawning in the worker thread when the batch is cancelled.
+        time.sleep(0.5)
+        proc = original_do_launch(cmd, kwargs)
+        started.append(proc)
+        return proc
+
+    monkeypatch.setattr(launcher, "_do_launch", do_launch)
+    cmds = [[sys.executable, "-c", "import time; time.sleep(30)"]] * 2
+    task = asyncio.ensure_future(async_launch_kernels(cmds))
+    while not spawning.is_set():
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert len(started) == 2
+    assert [proc.returncode for proc in started] == [-signal.SIGKILL] * 2
+
+
+async def test_async_launch_kernels_max_concurrency():
+    with pytest.raises(ValueError):
+        await async_launch_kernels([[sys.executable, "-c", "pass"]], max_concurrency=0)
+
+
+def test_launch_kernel_resolves_executable(monkeypatch):
+    monkeypatch.setattr(launcher, "_which_cache", {})
+    bindir = os.path.dirname(sys.executable)
+    name = os.path.basename(sys.executable)
+    env = dict(os.environ, PATH=bindir)
+    cmd, kwargs, _ = launcher._prepare_launch([name, "-c", "pass"], env=env)
+    # argv[0] is left alone, only the file Popen runs is resolved.
+    assert cmd[0] == name
+    assert kwargs["executable"] == os.path.join(bindir, name)
+    proc = launch_kernel([name, "-c", "pass"], env=env)
+    assert proc.wait() == 0
+    assert launcher._which_cache == {(name, bindir): os.path.join(bindir, name)}
+
+
+def test_launch_kernel_shell(monkeypatch):
+    monkeypatch.setattr(launcher, "_which_cache", {})
+    _, kwargs, _ = launcher._prepare_launch(["ls"], kw={"shell": True})
+    assert "executable" not in kwargs
+    proc = launch_kernel(["echo kernel"], shell=True, stdout=PIPE)
+    out, _ = proc.communicate()
+    assert proc.returncode == 0
+    assert out.strip() == b"kernel"
+    assert launcher._which_cache == {}
+
+
+def test_launch_kernel_relative_path_entry(monkeypatch, tmp_path):
+    monkeypatch.setattr(launcher, "_which_cache", {})
+    for where in ("abs", os.path.join("kcwd", "bin")):
+        tool = tmp_path / where / "tool"
+        tool.parent.mkdir(parents=True)
+        tool.write_text(f"#!/bin/sh\necho {where}\n")
+        tool.chmod(0o755)
+    monkeypatch.chdir(tmp_path)
+    env = dict(os.environ, PATH=os.pathsep.join(["bin", str(tmp_path / "abs")]))
+    proc = launch_kernel(["tool"], env=env, cwd=str(tmp_path / "kcwd"), stdout=PIPE)
+    out, _ = proc.communicate()
+    # Like exec, the relative entry is searched from the kernel's cwd.
+    assert out.strip() == os.path.join("kcwd", "bin").encode()
+    assert launcher._which_cache == {}
+
+
+def test_launch_kernel_failure_log_excludes_env(monkeypatch, caplog):
+    logger = logging.getLogger("jupyter_client.tests.test_launcher")
+    monkeypatch.setattr(launcher, "get_logger", lambda: logger)
+    missing = os.path.join(os.path.dirname(__file__), "no-such-executable")
+    env = dict(PATH="/some/bin", SECRET_TOKEN="do-not-log")
+    with caplog.at_level(logging.ERROR, logger=logger.name):
+        with pytest.raises(FileNotFoundError):
+            launch_kernel([missing], env=env)
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert missing in message
+    assert "PATH='/some/bin'" in message
+    assert "start_new_session" in message
+    assert "do-not-log" not in message
+    assert "SECRET_TOKEN" not in message
+
+
+@pytest.mark.parametrize("kw", [{}, {"bufsize": 0}, {"text": True}])
+def test_launch_kernel_closes_stdin(kw):
+    proc = launch_kernel([sys.executable, "-c", "import sys; sys.stdin.read()"], **kw)
+    # The pipe created for stdin is closed and dropped, so the kernel sees EOF.
+    assert proc.stdin is None
+    assert proc.wait() == 0